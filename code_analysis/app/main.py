@@ -1,8 +1,21 @@
 from fastapi import FastAPI
-from app.routes.analyze import router as analyze_router
+from fastapi.responses import ORJSONResponse
+from app.routes.analyze import (
+    cancel_clone_tasks,
+    close_client,
+    close_jobs_store,
+    router as analyze_router,
+    start_process_pool,
+    stop_process_pool,
+)
 
-app = FastAPI(title="Code Analysis Service")
+app = FastAPI(title="Code Analysis Service", default_response_class=ORJSONResponse)
 app.include_router(analyze_router)
+app.add_event_handler("startup", start_process_pool)
+app.add_event_handler("shutdown", cancel_clone_tasks)
+app.add_event_handler("shutdown", close_client)
+app.add_event_handler("shutdown", close_jobs_store)
+app.add_event_handler("shutdown", stop_process_pool)
 
 
 @app.get("/")
@@ -5,23 +5,128 @@ It handles asynchronous Git repository cloning and function extraction,
 and communicates with the LLM Service for function analysis.
 """
 
+import ast
+import asyncio
+import functools
+import io
+import json
 import os
+import re
+import shutil
 import uuid
 import tempfile
-import re
+import tokenize
 import logging
-from typing import Dict
-
-import git
-import requests
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from pydantic import BaseModel
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import anyio
+import httpx
+import ormsgpack
+import redis.asyncio as redis
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 
 router = APIRouter()
 logging.basicConfig(level=logging.INFO)
 
-# In-memory store for job_id -> repository path.
-JOBS: Dict[str, str] = {}
+# Redis store for job_id -> repository path, shared by all worker processes.
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+JOB_TTL_SECONDS = 86400
+JOBS = redis.Redis.from_url(REDIS_URL, max_connections=20, decode_responses=True)
+
+LLM_SERVICE_URL = os.getenv("LLM_SERVICE_URL", "http://localhost:8000/analyze")
+LLM_SERVICE_BATCH_URL = os.getenv(
+    "LLM_SERVICE_BATCH_URL", f"{LLM_SERVICE_URL.rstrip('/')}/batch"
+)
+LLM_SERVICE_STREAM_URL = os.getenv(
+    "LLM_SERVICE_STREAM_URL", f"{LLM_SERVICE_URL.rstrip('/')}/stream"
+)
+
+# Requests to the LLM Service are msgpack-encoded, which is smaller and faster
+# to (de)serialize than JSON. Responses to this service's clients stay JSON.
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Shared async HTTP client so connections to the LLM Service are kept alive,
+# multiplexed over HTTP/2 where available, and reused across requests.
+CLIENT = httpx.AsyncClient(
+    transport=httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        retries=2,
+    ),
+    timeout=30.0,
+)
+
+
+async def close_client() -> None:
+    """Closes the shared HTTP client and its pooled connections."""
+    await CLIENT.aclose()
+
+
+# Optional process pool for function extraction. Parsing large modules is
+# CPU-bound and holds the GIL, so with EXTRACTION_PROCESSES > 0 extraction runs
+# in worker processes instead of threads.
+EXTRACTION_PROCESSES = int(os.getenv("EXTRACTION_PROCESSES", "0"))
+_PROCESS_POOL: Optional[ProcessPoolExecutor] = None
+
+# A repository index lives in the process that built it, so repositories are
+# only indexed when extraction runs in this process. Pool workers load and
+# cache modules one at a time through _load_module instead of each parsing
+# every module of a repository on its first lookup.
+INDEX_REPOS = EXTRACTION_PROCESSES <= 0
+
+T = TypeVar("T")
+
+# Valid function_name values: "module_name.function", both plain identifiers.
+_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*\.[A-Za-z_][A-Za-z0-9_]*$")
+
+# Modules larger than this are scanned line by line for the target function
+# instead of being read and parsed in full.
+LARGE_MODULE_BYTES = 1024 * 1024
+# Tokens that do not start or end a logical line.
+_SKIPPED_TOKENS = (tokenize.NL, tokenize.COMMENT, tokenize.INDENT, tokenize.DEDENT)
+
+
+def start_process_pool() -> None:
+    """Starts the extraction process pool if EXTRACTION_PROCESSES is set."""
+    global _PROCESS_POOL  # pylint: disable=global-statement
+    if EXTRACTION_PROCESSES > 0:
+        _PROCESS_POOL = ProcessPoolExecutor(max_workers=EXTRACTION_PROCESSES)
+
+
+def stop_process_pool() -> None:
+    """Shuts down the extraction process pool, if any."""
+    global _PROCESS_POOL  # pylint: disable=global-statement
+    if _PROCESS_POOL is not None:
+        _PROCESS_POOL.shutdown(cancel_futures=True)
+        _PROCESS_POOL = None
+
+
+async def close_jobs_store() -> None:
+    """Closes the Redis job store and its pooled connections."""
+    await JOBS.aclose()
+
+
+def _job_key(job_id: str) -> str:
+    """Returns the Redis key under which a job's repository path is stored."""
+    return f"job:{job_id}"
 
 
 class RepoInput(BaseModel):
@@ -37,7 +142,90 @@ class FunctionAnalysisInput(BaseModel):
     function_name: str
 
 
-def download_repo(repo_url: str, job_id: str) -> None:
+class FunctionsAnalysisInput(BaseModel):
+    """Input model for batched function analysis with job ID and function names."""
+
+    job_id: str
+    function_names: List[str] = Field(min_length=1)
+
+
+# Clone tasks started by /analyze/start. References are kept until each task
+# finishes so they are not garbage collected while running.
+_CLONE_TASKS: Set["asyncio.Task[None]"] = set()
+
+# Maximum number of git clone subprocesses running at once; further clones
+# wait for a slot. The semaphore is created on first use, inside the running
+# event loop, since on Python 3.9 it would otherwise bind to a different loop.
+MAX_CONCURRENT_CLONES = int(os.getenv("MAX_CONCURRENT_CLONES", "4"))
+_CLONE_SEMAPHORE: Optional[asyncio.Semaphore] = None
+
+
+def _clone_semaphore() -> asyncio.Semaphore:
+    """Returns the semaphore that bounds concurrent clones."""
+    global _CLONE_SEMAPHORE  # pylint: disable=global-statement
+    if _CLONE_SEMAPHORE is None:
+        _CLONE_SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENT_CLONES)
+    return _CLONE_SEMAPHORE
+
+
+def _forget_clone_task(task: "asyncio.Task[None]") -> None:
+    """Drops a finished clone task; failures are already logged by download_repo."""
+    _CLONE_TASKS.discard(task)
+    if not task.cancelled():
+        task.exception()
+
+
+async def cancel_clone_tasks() -> None:
+    """Cancels running clones and waits for their git processes to exit."""
+    for task in list(_CLONE_TASKS):
+        task.cancel()
+    await asyncio.gather(*_CLONE_TASKS, return_exceptions=True)
+
+
+async def _remove_repo(repo_path: str) -> None:
+    """Removes a cloned or partially cloned repository, if present."""
+    await anyio.to_thread.run_sync(
+        functools.partial(shutil.rmtree, repo_path, ignore_errors=True)
+    )
+
+
+async def _clone_repo(repo_url: str, repo_path: str) -> None:
+    """
+    Shallow-clones a Git repository into repo_path with a git subprocess.
+
+    Raises:
+        RuntimeError: If git exits with a non-zero status.
+    """
+    # Only the working tree of the default branch is needed, so skip
+    # history and tags, and fail fast instead of prompting for credentials.
+    async with _clone_semaphore():
+        process = await asyncio.create_subprocess_exec(
+            "git",
+            "clone",
+            "--depth=1",
+            "--single-branch",
+            "--no-tags",
+            "--",
+            repo_url,
+            repo_path,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+            env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+        )
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            # Do not leave git running, or a half-written clone, behind.
+            process.kill()
+            await process.wait()
+            await _remove_repo(repo_path)
+            raise
+    if process.returncode != 0:
+        await _remove_repo(repo_path)
+        raise RuntimeError(stderr.decode(errors="replace").strip())
+
+
+async def download_repo(repo_url: str, job_id: str) -> None:
     """
     Downloads a Git repository to a temporary location.
 
@@ -50,35 +238,228 @@ def download_repo(repo_url: str, job_id: str) -> None:
     """
     repo_path = os.path.join(tempfile.gettempdir(), job_id)
     try:
-        git.Repo.clone_from(repo_url, repo_path)
-        JOBS[job_id] = repo_path
+        await _clone_repo(repo_url, repo_path)
+        if INDEX_REPOS:
+            await anyio.to_thread.run_sync(_index_repo, repo_path)
+        await JOBS.set(_job_key(job_id), repo_path, ex=JOB_TTL_SECONDS)
         logging.info("Repository cloned for job %s at %s", job_id, repo_path)
     except Exception as e:
         logging.error("Failed to clone repository for job %s: %s", job_id, str(e))
-        JOBS.pop(job_id, None)
+        await _remove_repo(repo_path)
+        await JOBS.delete(_job_key(job_id))
         raise Exception(f"Failed to clone repo: {str(e)}") from e
 
 
 @router.post("/analyze/start")
-def start_analysis(
-    data: RepoInput, background_tasks: BackgroundTasks
-) -> Dict[str, str]:
+async def start_analysis(data: RepoInput) -> Dict[str, str]:
     """
     Starts a background job to download a GitHub repository.
     Returns a job_id for later reference.
 
     Args:
         data (RepoInput): The input containing the repository URL.
-        background_tasks (BackgroundTasks): FastAPI background task manager.
 
     Returns:
         dict: A dictionary containing the job_id.
+
+    Raises:
+        HTTPException: If repo_url is not an http(s) URL.
     """
+    url = urlsplit(data.repo_url)
+    if url.scheme not in ("http", "https") or not url.netloc:
+        raise HTTPException(
+            status_code=400, detail="repo_url must be an http(s) repository URL"
+        )
+
     job_id = str(uuid.uuid4())
-    background_tasks.add_task(download_repo, data.repo_url, job_id)
+    task = asyncio.create_task(download_repo(data.repo_url, job_id))
+    _CLONE_TASKS.add(task)
+    task.add_done_callback(_forget_clone_task)
     return {"job_id": job_id}
 
 
+# Source lines, source encoding and parsed AST of a module.
+LoadedModule = Tuple[List[bytes], str, ast.Module]
+
+
+@functools.lru_cache(maxsize=256)
+def _load_module(file_path: str, mtime_ns: int) -> LoadedModule:
+    """
+    Reads a module file and parses it into an AST.
+
+    The raw bytes are handed straight to the parser, which decodes them
+    according to the module's encoding declaration, and only the lines of an
+    extracted function are decoded later on. Results are cached per
+    (file_path, mtime_ns) so analyzing several functions of the same unchanged
+    module reads and parses it only once.
+
+    Returns:
+        LoadedModule: The source lines, the source encoding and the parsed module.
+    """
+    source = Path(file_path).read_bytes()
+    encoding, _ = tokenize.detect_encoding(io.BytesIO(source).readline)
+    return source.splitlines(), encoding, ast.parse(source, filename=file_path)
+
+
+@functools.lru_cache(maxsize=32)
+def _index_repo(repo_path: str) -> Dict[str, LoadedModule]:
+    """
+    Loads and parses every top-level module of a cloned repository once.
+
+    The index maps module names to the result of _load_module, so function
+    lookups for a job become a dict lookup instead of a stat, read and parse.
+    Cloned repositories do not change, so the index is cached per repo_path.
+    Only used when INDEX_REPOS is set, i.e. without the process pool.
+    Large modules and modules that fail to load are left out and handled by
+    extract_function_code directly.
+    """
+    root = Path(repo_path).resolve()
+    index = {}
+    for path in root.glob("*.py"):
+        try:
+            resolved = path.resolve()
+            if not resolved.is_relative_to(root):
+                continue
+            stat = resolved.stat()
+            if stat.st_size <= LARGE_MODULE_BYTES:
+                index[path.stem] = _load_module(str(resolved), stat.st_mtime_ns)
+        except (OSError, SyntaxError, ValueError):
+            continue
+    return index
+
+
+def _find_function(
+    tree: ast.Module, func_name: str
+) -> Optional[Union[ast.FunctionDef, ast.AsyncFunctionDef]]:
+    """Returns the first (outermost) definition of func_name in the tree."""
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+            and node.name == func_name
+        ):
+            return node
+    return None
+
+
+def _function_source(module: LoadedModule, module_name: str, func_name: str) -> str:
+    """
+    Returns the source of func_name from a module loaded by _load_module.
+
+    Raises:
+        HTTPException: If the module does not define the function.
+    """
+    lines, encoding, tree = module
+    node = _find_function(tree, func_name)
+    if node is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Function {func_name} not found in {module_name}.py",
+        )
+    return b"\n".join(lines[node.lineno - 1 : node.end_lineno]).decode(encoding)
+
+
+def _validate_function_name(function_name: str) -> None:
+    """
+    Rejects function_name values that are not "module_name.function".
+
+    Routes call this before any Redis or filesystem access so malformed names
+    are refused without I/O.
+
+    Raises:
+        HTTPException: If function_name is malformed.
+    """
+    if not _NAME_RE.fullmatch(function_name):
+        raise HTTPException(
+            status_code=400,
+            detail="function_name must be in the format 'module_name.function'",
+        )
+
+
+def _logical_lines(
+    tokens: Iterable[tokenize.TokenInfo],
+) -> Iterator[Tuple[tokenize.TokenInfo, List[str], int]]:
+    """
+    Groups tokens into logical lines.
+
+    Yields the first token of each logical line, the strings of its first
+    three tokens and the row on which the previous logical line ended. A line
+    is yielded as soon as its first three tokens are known, so no more of the
+    file is read than needed to recognise a definition. The end of the file is
+    yielded as a final line starting at column 0.
+    """
+    first: Optional[tokenize.TokenInfo] = None
+    head: List[str] = []
+    end_row = 0
+    for token in tokens:
+        if token.type in _SKIPPED_TOKENS:
+            continue
+        if token.type == tokenize.ENDMARKER:
+            yield token, [], end_row
+            return
+        if token.type == tokenize.NEWLINE:
+            if first is not None and len(head) < 3:
+                yield first, head, end_row
+            first = None
+            end_row = token.start[0]
+            continue
+        if first is None:
+            first, head = token, []
+        if len(head) < 3:
+            head.append(token.string)
+            if len(head) == 3:
+                yield first, head, end_row
+
+
+def _scan_function(file_path: str, func_name: str) -> Optional[str]:
+    """
+    Finds a function by tokenizing the module line by line.
+
+    Used for large modules, where reading and parsing the whole file for one
+    small function is wasteful. Working on tokens rather than raw text means
+    strings, comments and multi-line signatures cannot end a function early or
+    late. A function ends where the next statement starts at its own
+    indentation or shallower.
+
+    Like _find_function, the outermost definition wins: a shallower candidate
+    replaces a deeper one, and a top-level definition stops the scan as soon as
+    its body ends, so only the lines up to the end of the function are read.
+    Indentation stands in for AST depth, which matches for classes and nested
+    functions.
+    """
+    best: Optional[str] = None
+    best_indent = 0
+    captured: List[str] = []
+    capturing = False
+    base_indent = start_row = 0
+    heads = (["def", func_name], ["async", "def", func_name])
+
+    with tokenize.open(file_path) as f:
+
+        def readline() -> str:
+            line = f.readline()
+            if capturing:
+                captured.append(line)
+            return line
+
+        for first, head, end_row in _logical_lines(tokenize.generate_tokens(readline)):
+            indent = first.start[1]
+            if capturing and indent <= base_indent:
+                capturing = False
+                best = "".join(captured[: end_row - start_row + 1]).rstrip()
+                best_indent = base_indent
+                if best_indent == 0:
+                    break
+            if (
+                not capturing
+                and (head[:2] in heads or head in heads)
+                and (best is None or indent < best_indent)
+            ):
+                capturing = True
+                start_row, base_indent = first.start
+                captured = [first.line]
+    return best
+
+
 def extract_function_code(repo_path: str, function_name: str) -> str:
     """
     Extracts the function code from a repository.
@@ -93,74 +474,271 @@ def extract_function_code(repo_path: str, function_name: str) -> str:
         str: The extracted function code.
 
     Raises:
-        HTTPException: If the module or function cannot be found.
+        HTTPException: If function_name is malformed, the module cannot be
+            parsed, or the module or function cannot be found.
     """
-    try:
-        module_name, func_name = function_name.split(".")
-    except ValueError:
-        raise HTTPException(
-            status_code=400,
-            detail="function_name must be in the format 'module_name.function'",
-        )
+    _validate_function_name(function_name)
+    module_name, func_name = function_name.split(".")
+
+    indexed = _index_repo(repo_path).get(module_name) if INDEX_REPOS else None
+    if indexed is not None:
+        return _function_source(indexed, module_name, func_name)
 
-    file_path = os.path.join(repo_path, f"{module_name}.py")
-    if not os.path.exists(file_path):
+    # Resolve symlinks so a module file cannot point outside the repository.
+    root = Path(repo_path).resolve()
+    resolved = (root / f"{module_name}.py").resolve()
+    file_path = str(resolved)
+    try:
+        if not resolved.is_relative_to(root):
+            raise FileNotFoundError(file_path)
+        stat = os.stat(file_path)
+    except FileNotFoundError as e:
         raise HTTPException(
             status_code=404,
             detail=f"Module file {module_name}.py not found in repository.",
-        )
+        ) from e
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    try:
+        if stat.st_size <= LARGE_MODULE_BYTES:
+            module = _load_module(file_path, stat.st_mtime_ns)
+            return _function_source(module, module_name, func_name)
+        function_code = _scan_function(file_path, func_name)
+    except (SyntaxError, tokenize.TokenError) as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Module file {module_name}.py could not be parsed: {str(e)}",
+        ) from e
 
-    pattern = rf"def\s+{func_name}\s*\(.*?\):(?:\n\s+.*)+"
-    match = re.search(pattern, content)
-    if not match:
+    if function_code is None:
         raise HTTPException(
             status_code=404,
             detail=f"Function {func_name} not found in {module_name}.py",
         )
-    return match.group(0)
+    return function_code
 
 
-@router.post("/analyze/function")
-def analyze_function(data: FunctionAnalysisInput) -> dict:
+def extract_function_codes(repo_path: str, function_names: List[str]) -> List[str]:
     """
-    Analyzes a function from a previously downloaded repository.
-    Extracts the function code and sends it to the LLM Service for analysis.
+    Extracts several functions from a repository in one pass.
+
+    Functions from the same module share a single read and parse through the
+    module cache.
 
     Args:
-        data (FunctionAnalysisInput): Input containing job_id and function name.
+        repo_path (str): Path to the cloned repository.
+        function_names (List[str]): Target functions in "module_name.function" format.
 
     Returns:
-        dict: The LLM Service response containing suggestions.
+        List[str]: The extracted function codes, in the order requested.
+
+    Raises:
+        HTTPException: If any module or function cannot be found or parsed.
     """
-    job_id = data.job_id
-    if job_id not in JOBS:
-        raise HTTPException(
-            status_code=404, detail="Invalid job_id or job not completed yet."
-        )
-    repo_path = JOBS[job_id]
+    return [extract_function_code(repo_path, name) for name in function_names]
+
+
+def _call_in_process(func: Callable[..., T], *args: Any) -> Tuple[bool, Any]:
+    """
+    Runs func in a worker process, returning (ok, result).
+
+    HTTPException does not survive pickling, so it is returned as
+    (False, (status_code, detail)) and re-raised by the caller.
+    """
+    try:
+        return True, func(*args)
+    except HTTPException as he:
+        return False, (he.status_code, he.detail)
+
+
+async def _run_extraction(func: Callable[..., T], *args: Any) -> T:
+    """
+    Runs an extraction function off the event loop.
+
+    Uses the process pool when it is enabled and a worker thread otherwise.
 
+    Raises:
+        HTTPException: If the function raises one, or 500 on any other error.
+    """
     try:
-        function_code = extract_function_code(repo_path, data.function_name)
+        if _PROCESS_POOL is None:
+            return await anyio.to_thread.run_sync(func, *args)
+        loop = asyncio.get_running_loop()
+        ok, result = await loop.run_in_executor(
+            _PROCESS_POOL, _call_in_process, func, *args
+        )
     except HTTPException as he:
         raise he
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error extracting function code: {str(e)}"
         ) from e
+    if not ok:
+        status_code, detail = result
+        raise HTTPException(status_code=status_code, detail=detail)
+    return result
+
+
+async def _get_repo_path(job_id: str) -> str:
+    """Returns the repository path for a completed job or raises a 404."""
+    repo_path = await JOBS.get(_job_key(job_id))
+    if repo_path is None:
+        raise HTTPException(
+            status_code=404, detail="Invalid job_id or job not completed yet."
+        )
+    return repo_path
+
+
+async def _call_llm_service(url: str, payload: dict) -> dict:
+    """
+    Posts a msgpack-encoded payload to the LLM Service and returns its
+    decoded response (msgpack, or JSON if the service replies with JSON).
 
-    llm_service_url = os.getenv("LLM_SERVICE_URL", "http://localhost:8000/analyze")
+    Raises:
+        HTTPException: If the request fails or returns an error status.
+    """
     try:
-        response = requests.post(
-            llm_service_url,
-            json={"function_code": function_code},
-            timeout=30,
+        response = await CLIENT.post(
+            url,
+            content=ormsgpack.packb(payload),
+            headers={"Content-Type": MSGPACK_MEDIA_TYPE, "Accept": MSGPACK_MEDIA_TYPE},
         )
         response.raise_for_status()
+        if response.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+            return ormsgpack.unpackb(response.content)
         return response.json()
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error calling LLM Service: {str(e)}"
         ) from e
+
+
+async def _open_llm_stream(url: str, payload: dict) -> httpx.Response:
+    """
+    Posts a payload to the LLM Service and returns the response with its body
+    still unread, so its status can be checked before streaming starts.
+
+    Raises:
+        HTTPException: If the request fails or returns an error status.
+    """
+    request = CLIENT.build_request(
+        "POST",
+        url,
+        content=ormsgpack.packb(payload),
+        headers={"Content-Type": MSGPACK_MEDIA_TYPE},
+    )
+    try:
+        response = await CLIENT.send(request, stream=True)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Error calling LLM Service: {str(e)}"
+        ) from e
+    try:
+        response.raise_for_status()
+    except Exception as e:
+        await response.aclose()
+        raise HTTPException(
+            status_code=500, detail=f"Error calling LLM Service: {str(e)}"
+        ) from e
+    return response
+
+
+async def _stream_llm_service(response: httpx.Response) -> AsyncIterator[str]:
+    """
+    Yields an open LLM Service response as newline-delimited JSON, line by
+    line as it arrives, and closes it when done.
+
+    Errors cannot change the status code once streaming has started, so the
+    ones raised part way are reported as a final {"error": ...} line instead.
+    """
+    try:
+        async for line in response.aiter_lines():
+            if line:
+                yield line + "\n"
+    except Exception as e:
+        yield json.dumps({"error": f"Error calling LLM Service: {str(e)}"}) + "\n"
+    finally:
+        await response.aclose()
+
+
+@router.post("/analyze/function")
+async def analyze_function(data: FunctionAnalysisInput) -> dict:
+    """
+    Analyzes a function from a previously downloaded repository.
+    Extracts the function code and sends it to the LLM Service for analysis.
+
+    Args:
+        data (FunctionAnalysisInput): Input containing job_id and function name.
+
+    Returns:
+        dict: The LLM Service response containing suggestions.
+    """
+    _validate_function_name(data.function_name)
+    repo_path = await _get_repo_path(data.job_id)
+
+    function_code = await _run_extraction(
+        extract_function_code, repo_path, data.function_name
+    )
+
+    return await _call_llm_service(LLM_SERVICE_URL, {"function_code": function_code})
+
+
+@router.post("/analyze/function/stream")
+async def analyze_function_stream(data: FunctionAnalysisInput) -> StreamingResponse:
+    """
+    Analyzes a function like /analyze/function, but streams the LLM Service
+    response back as newline-delimited JSON while it is being generated.
+
+    Args:
+        data (FunctionAnalysisInput): Input containing job_id and function name.
+
+    Returns:
+        StreamingResponse: {"delta": ...} lines, ending with an {"error": ...}
+        line if the analysis fails part way.
+
+    Raises:
+        HTTPException: If the LLM Service cannot be reached or rejects the
+        request before streaming starts.
+    """
+    _validate_function_name(data.function_name)
+    repo_path = await _get_repo_path(data.job_id)
+    function_code = await _run_extraction(
+        extract_function_code, repo_path, data.function_name
+    )
+    response = await _open_llm_stream(
+        LLM_SERVICE_STREAM_URL, {"function_code": function_code}
+    )
+    return StreamingResponse(
+        _stream_llm_service(response), media_type="application/x-ndjson"
+    )
+
+
+@router.post("/analyze/functions")
+async def analyze_functions(data: FunctionsAnalysisInput) -> dict:
+    """
+    Analyzes several functions from a previously downloaded repository.
+    Extracts all function codes and sends them to the LLM Service in a
+    single batched request.
+
+    Args:
+        data (FunctionsAnalysisInput): Input containing job_id and function names.
+
+    Returns:
+        dict: A dictionary with one result per function, in the order requested.
+    """
+    for function_name in data.function_names:
+        _validate_function_name(function_name)
+    repo_path = await _get_repo_path(data.job_id)
+
+    function_codes = await _run_extraction(
+        extract_function_codes, repo_path, data.function_names
+    )
+
+    response = await _call_llm_service(
+        LLM_SERVICE_BATCH_URL, {"function_codes": function_codes}
+    )
+    return {
+        "results": [
+            {"function_name": name, **result}
+            for name, result in zip(data.function_names, response["results"])
+        ]
+    }
@@ -0,0 +1,92 @@
+"""
+Tests that the tokenize-based scan for large modules extracts the same
+function source as the AST path used for all other modules.
+"""
+
+import os
+from typing import Optional
+
+import pytest
+from fastapi import HTTPException
+
+from app.routes.analyze import _function_source, _load_module, _scan_function
+
+CASES = {
+    "paren in string": (
+        "def f(a=')'):\n    x = '('\n    return x\n\ndef g():\n    pass\n",
+        "f",
+    ),
+    "unbalanced paren in body": (
+        "def f():\n    s = ')' + '(('\n    return s\n\ny = 1\n",
+        "f",
+    ),
+    "nested before top level": (
+        "class C:\n    def f(self):\n        return 1\n\ndef f():\n    return 2\n",
+        "f",
+    ),
+    "nested only": (
+        "class C:\n    def f(self):\n        return 1\n\n    def g(self):\n"
+        "        pass\n",
+        "f",
+    ),
+    "inner function": (
+        "def outer():\n    def f():\n        return 1\n    return f\n",
+        "f",
+    ),
+    "multi-line signature": (
+        "def f(\n    a,\n    b=(1, 2),\n) -> int:\n    return a\n\nz = 0\n",
+        "f",
+    ),
+    "column-0 comment in body": (
+        "def f():\n    a = 1\n# not the end\n    return a\n\ndef g():\n    pass\n",
+        "f",
+    ),
+    "one-liner": ("def f(): return 1\ndef g(): return 2\n", "f"),
+    "async": ("async def f():\n    await g()\n\nx = 1\n", "f"),
+    "prefix name": (
+        "def f_long():\n    return 1\n\ndef f():\n    return 2\n",
+        "f",
+    ),
+    "last function in file": ("x = 1\n\ndef f():\n    return x", "f"),
+    "trailing blank lines and comments": (
+        "def f():\n    return 1\n\n\n# trailing\n",
+        "f",
+    ),
+    "crlf": ("def f():\r\n    return 1\r\n\r\ndef g():\r\n    pass\r\n", "f"),
+    "docstring mentioning def": (
+        'def g():\n    """\ndef f():\n    """\n\ndef f():\n    return 1\n',
+        "f",
+    ),
+    "decorated": ("@dec\ndef f():\n    return 1\n", "f"),
+    "statement after dedent": (
+        "if True:\n    def f():\n        return 1\n    x = 2\n",
+        "f",
+    ),
+    "missing": ("def g():\n    pass\n", "f"),
+}
+
+
+def _ast_source(path: str, func_name: str) -> Optional[str]:
+    module = _load_module(path, os.stat(path).st_mtime_ns)
+    try:
+        return _function_source(module, "m", func_name)
+    except HTTPException as he:
+        assert he.status_code == 404
+        return None
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_scan_matches_ast(tmp_path, case):
+    source, func_name = CASES[case]
+    path = tmp_path / "m.py"
+    path.write_bytes(source.encode())
+    scanned = _scan_function(str(path), func_name)
+    assert scanned == _ast_source(str(path), func_name)
+    assert (scanned is None) == (case == "missing")
+
+
+def test_top_level_match_stops_reading(tmp_path):
+    # A syntax error after the function is never tokenized.
+    path = tmp_path / "m.py"
+    path.write_text("def f():\n    return 1\n\nx = (\n")
+    assert _scan_function(str(path), "f") == "def f():\n    return 1"
@@ -1,9 +1,20 @@
 from fastapi import FastAPI
-from app.routes.analyze import router as analyze_router
+from fastapi.responses import ORJSONResponse
+from app.routes.analyze import (
+    close_cache,
+    router as analyze_router,
+    start_warm_up,
+    stop_batcher,
+    stop_warm_up,
+)
 
-app = FastAPI(title="LLM Service")
+app = FastAPI(title="LLM Service", default_response_class=ORJSONResponse)
 
 app.include_router(analyze_router)
+app.add_event_handler("startup", start_warm_up)
+app.add_event_handler("shutdown", stop_warm_up)
+app.add_event_handler("shutdown", stop_batcher)
+app.add_event_handler("shutdown", close_cache)
 
 
 @app.get("/")
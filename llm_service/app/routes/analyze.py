@@ -4,15 +4,88 @@ This module defines the API endpoint for analyzing function code using
 different LLM providers. It uses a Strategy Pattern to decouple provider-specific logic.
 """
 
+import asyncio
+import hashlib
+import json
+import logging
 import os
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
-from fastapi import APIRouter, HTTPException
-from ollama import generate
-from pydantic import BaseModel
+import ormsgpack
+import redis.asyncio as redis
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from ollama import AsyncClient
+from pydantic import BaseModel, Field, ValidationError
 
 router = APIRouter()
 
+# Media type used by the Code Analysis Service for its requests and, when it
+# asks for it via Accept, for responses. Other clients keep using JSON.
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+OLLAMA_MODEL = "qwen2.5-coder:1.5b"
+# Keep the model loaded in memory indefinitely instead of letting Ollama
+# unload it after a few idle minutes.
+OLLAMA_KEEP_ALIVE = -1
+
+# Maximum number of generations submitted to Ollama at once.
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+# Maximum number of queued prompts dispatched together, and how long the
+# batcher waits for more prompts to arrive before dispatching. Ollama has no
+# batched generate call, so each prompt is still its own request; a window
+# only delays lone requests by up to its length and is off by default.
+LLM_MAX_BATCH = int(os.getenv("LLM_MAX_BATCH", "8"))
+LLM_BATCH_WINDOW_MS = int(os.getenv("LLM_BATCH_WINDOW_MS", "0"))
+
+# Redis cache of generated responses, keyed by model and function code hash.
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", "604800"))
+CACHE = redis.Redis.from_url(REDIS_URL, max_connections=20, decode_responses=True)
+
+
+async def close_cache() -> None:
+    """
+    Close the response cache and its pooled connections.
+    """
+    await CACHE.aclose()
+
+
+def _cache_key(function_code: str) -> str:
+    digest = hashlib.blake2b(function_code.encode(), digest_size=16).hexdigest()
+    return f"llm:{OLLAMA_MODEL}:{digest}"
+
+
+async def _cache_get(key: str) -> Optional[str]:
+    try:
+        return await CACHE.get(key)
+    except Exception as e:
+        logging.warning("LLM cache lookup failed: %s", str(e))
+        return None
+
+
+async def _cache_set(key: str, response: str) -> None:
+    try:
+        await CACHE.set(key, response, ex=LLM_CACHE_TTL_SECONDS)
+    except Exception as e:
+        logging.warning("LLM cache store failed: %s", str(e))
+
 
 class FunctionCode(BaseModel):
     """
@@ -22,32 +95,315 @@ class FunctionCode(BaseModel):
     function_code: str
 
 
+class FunctionCodes(BaseModel):
+    """
+    Pydantic model for batched function code input.
+    """
+
+    function_codes: List[str] = Field(min_length=1)
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def _request_body(model: Type[ModelT]) -> Callable[[Request], Awaitable[ModelT]]:
+    """
+    Build a dependency that parses the request body into model, decoding
+    msgpack bodies and falling back to JSON for any other content type.
+    """
+
+    async def parse(request: Request) -> ModelT:
+        body = await request.body()
+        try:
+            if request.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+                try:
+                    data = ormsgpack.unpackb(body)
+                except ormsgpack.MsgpackDecodeError as e:
+                    raise HTTPException(
+                        status_code=400, detail=f"Invalid msgpack body: {str(e)}"
+                    ) from e
+                return model.model_validate(data)
+            return model.model_validate_json(body)
+        except ValidationError as e:
+            raise RequestValidationError(_body_errors(e)) from e
+
+    return parse
+
+
+def _body_errors(exc: ValidationError) -> List[Dict[str, Any]]:
+    """
+    Report validation errors under "body" like FastAPI's own body validation.
+    A body that is not JSON at all gets an empty input instead of the raw
+    bytes, which may not even be UTF-8 and would otherwise be echoed back.
+    """
+    errors = []
+    for error in exc.errors(include_url=False):
+        error = {**error, "loc": ("body", *error["loc"])}
+        if error["type"] == "json_invalid":
+            error["input"] = {}
+        else:
+            try:
+                jsonable_encoder(error["input"])
+            except UnicodeDecodeError:
+                # msgpack bin values decode to bytes that may not be UTF-8.
+                error["input"] = {}
+        errors.append(error)
+    return errors
+
+
+def _body_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    OpenAPI request body for routes that parse their body with _request_body.
+    """
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": model.model_json_schema()},
+                MSGPACK_MEDIA_TYPE: {"schema": model.model_json_schema()},
+            },
+        }
+    }
+
+
+def _respond(request: Request, content: Any) -> Any:
+    """
+    Return content as msgpack if the client accepts it, otherwise as JSON.
+    """
+    if MSGPACK_MEDIA_TYPE in request.headers.get("accept", ""):
+        return Response(ormsgpack.packb(content), media_type=MSGPACK_MEDIA_TYPE)
+    return content
+
+
+@dataclass
+class _LoopState:
+    """
+    The queue, semaphore and tasks of a MicroBatcher, all bound to one event loop.
+    """
+
+    loop: asyncio.AbstractEventLoop
+    semaphore: asyncio.Semaphore
+    queue: "asyncio.Queue[Tuple[str, asyncio.Future]]" = field(
+        default_factory=asyncio.Queue
+    )
+    worker: Optional[asyncio.Task] = None
+    batches: Set[asyncio.Task] = field(default_factory=set)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent generation requests into small batches.
+
+    Prompts are queued and a background task collects up to `max_batch` of
+    them, those already queued plus any that arrive within `window_ms`, then
+    dispatches the batch to Ollama concurrently. A semaphore bounds the number
+    of in-flight generations across batches.
+
+    The batcher is created at import time, so the queue and semaphore are only
+    created on first use inside the running event loop; on Python 3.9 they
+    would otherwise be bound to a different loop.
+    """
+
+    def __init__(self, max_batch: int, window_ms: int, max_concurrency: int):
+        self._max_batch = max_batch
+        self._window = window_ms / 1000
+        self._max_concurrency = max_concurrency
+        self._client = AsyncClient()
+        self._state: Optional[_LoopState] = None
+
+    def _bind_loop(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        if self._state is None or self._state.loop is not loop:
+            self._state = _LoopState(loop, asyncio.Semaphore(self._max_concurrency))
+        return self._state
+
+    async def submit(self, prompt: str) -> dict:
+        """
+        Queue a prompt and wait for its generation result.
+        """
+        state = self._bind_loop()
+        if state.worker is None or state.worker.done():
+            state.worker = state.loop.create_task(self._collect(state))
+        future: asyncio.Future = state.loop.create_future()
+        await state.queue.put((prompt, future))
+        return await future
+
+    async def stop(self) -> None:
+        """
+        Cancel the collecting task, in-flight batches and queued prompts.
+        """
+        state, self._state = self._state, None
+        if state is None:
+            return
+        tasks = [*state.batches, *([state.worker] if state.worker else [])]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        while not state.queue.empty():
+            _, future = state.queue.get_nowait()
+            future.cancel()
+
+    async def stream(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Generate a response for a single prompt, yielding text as it is produced.
+        Streams bypass batching but share the concurrency limit.
+        """
+        async with self._bind_loop().semaphore:
+            async for chunk in await self._client.generate(
+                OLLAMA_MODEL, prompt, stream=True, keep_alive=OLLAMA_KEEP_ALIVE
+            ):
+                yield chunk["response"]
+
+    async def warm_up(self) -> None:
+        """
+        Load the model into memory with a one-token generation.
+        """
+        await self._client.generate(
+            OLLAMA_MODEL,
+            "warmup",
+            options={"num_predict": 1},
+            keep_alive=OLLAMA_KEEP_ALIVE,
+        )
+
+    async def _collect(self, state: _LoopState) -> None:
+        while True:
+            batch = [await state.queue.get()]
+            while len(batch) < self._max_batch and not state.queue.empty():
+                batch.append(state.queue.get_nowait())
+            deadline = state.loop.time() + self._window
+            while len(batch) < self._max_batch:
+                timeout = deadline - state.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(state.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch without awaiting so the next batch can be collected
+            # while this one is being generated.
+            task = asyncio.create_task(self._dispatch(state, batch))
+            state.batches.add(task)
+            task.add_done_callback(state.batches.discard)
+
+    async def _dispatch(
+        self, state: _LoopState, batch: List[Tuple[str, asyncio.Future]]
+    ) -> None:
+        await asyncio.gather(
+            *(self._generate(state, prompt, future) for prompt, future in batch)
+        )
+
+    async def _generate(
+        self, state: _LoopState, prompt: str, future: asyncio.Future
+    ) -> None:
+        async with state.semaphore:
+            if future.cancelled():
+                return
+            try:
+                result = await self._client.generate(
+                    OLLAMA_MODEL, prompt, keep_alive=OLLAMA_KEEP_ALIVE
+                )
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+                return
+            if not future.cancelled():
+                future.set_result(result)
+
+
+_BATCHER = MicroBatcher(LLM_MAX_BATCH, LLM_BATCH_WINDOW_MS, LLM_MAX_CONCURRENCY)
+
+
+async def stop_batcher() -> None:
+    """
+    Stop the batcher's background tasks.
+    """
+    await _BATCHER.stop()
+
+
 class BaseLLMProvider(ABC):
     """
     Abstract base class for LLM providers.
     """
 
     @abstractmethod
-    def analyze(self, function_code: str) -> dict:
+    async def analyze(self, function_code: str) -> dict:
         """
         Analyze the given function code and return suggestions.
         """
         ...
 
+    async def analyze_batch(self, function_codes: List[str]) -> List[dict]:
+        """
+        Analyze several function codes and return one result per input.
+        Providers that can process prompts in parallel should override this.
+        """
+        return [await self.analyze(code) for code in function_codes]
+
+    async def warm_up(self) -> None:
+        """
+        Prepare the provider before the first request, e.g. by loading a model.
+        """
+
+    async def analyze_stream(self, function_code: str) -> AsyncIterator[str]:
+        """
+        Analyze the given function code, yielding the response text in chunks.
+        Providers that support token streaming should override this.
+        """
+        result = await self.analyze(function_code)
+        for suggestion in result["suggestions"]:
+            yield suggestion
+
 
 class LocalLLMProvider(BaseLLMProvider):
     """
     Local LLM provider using the Ollama package.
     """
 
-    def analyze(self, function_code: str) -> dict:
+    async def warm_up(self) -> None:
+        await _BATCHER.warm_up()
+
+    async def analyze(self, function_code: str) -> dict:
+        key = _cache_key(function_code)
+        cached = await _cache_get(key)
+        if cached is not None:
+            return {"suggestions": [cached]}
+
+        try:
+            result = await _BATCHER.submit(function_code)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Local LLM error: {str(e)}"
+            ) from e
+
+        await _cache_set(key, result["response"])
+        return {"suggestions": [result["response"]]}
+
+    async def analyze_batch(self, function_codes: List[str]) -> List[dict]:
+        # Queue every prompt at once so the batcher can dispatch them together.
+        return list(
+            await asyncio.gather(*(self.analyze(code) for code in function_codes))
+        )
+
+    async def analyze_stream(self, function_code: str) -> AsyncIterator[str]:
+        key = _cache_key(function_code)
+        cached = await _cache_get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        chunks = []
         try:
-            result = generate("qwen2.5-coder:1.5b", function_code)
-            return {"suggestions": [result["response"]]}
+            async for chunk in _BATCHER.stream(function_code):
+                chunks.append(chunk)
+                yield chunk
         except Exception as e:
             raise HTTPException(
                 status_code=500, detail=f"Local LLM error: {str(e)}"
             ) from e
+        await _cache_set(key, "".join(chunks))
 
 
 class OpenAILLMProvider(BaseLLMProvider):
@@ -55,7 +411,7 @@ class OpenAILLMProvider(BaseLLMProvider):
     Stub implementation for the OpenAI LLM provider.
     """
 
-    def analyze(self, function_code: str) -> dict:
+    async def analyze(self, function_code: str) -> dict:
         raise HTTPException(status_code=501, detail="OpenAI provider not implemented.")
 
 
@@ -64,12 +420,71 @@ class DeepSeekLLMProvider(BaseLLMProvider):
     Stub implementation for the DeepSeek LLM provider.
     """
 
-    def analyze(self, function_code: str) -> dict:
+    async def analyze(self, function_code: str) -> dict:
         raise HTTPException(
             status_code=501, detail="DeepSeek provider not implemented."
         )
 
 
+# Providers are created once and shared by all requests.
+PROVIDERS: Dict[str, BaseLLMProvider] = {
+    "local": LocalLLMProvider(),
+    "openai": OpenAILLMProvider(),
+    "deepseek": DeepSeekLLMProvider(),
+}
+
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "local").lower()
+
+
+# Warm-up runs in the background so startup never waits on Ollama. Each
+# attempt is bounded by a timeout and failed attempts are retried with a
+# growing delay, so an Ollama that starts after this service still gets warmed.
+LLM_WARM_UP_TIMEOUT_SECONDS = float(os.getenv("LLM_WARM_UP_TIMEOUT_SECONDS", "120"))
+LLM_WARM_UP_ATTEMPTS = int(os.getenv("LLM_WARM_UP_ATTEMPTS", "10"))
+_WARM_UP_TASK: Optional["asyncio.Task[None]"] = None
+
+
+async def warm_up_provider() -> None:
+    """
+    Warm up the configured provider so the first request does not pay its
+    start-up cost (e.g. loading the local model), retrying while it fails.
+    """
+    provider = PROVIDERS.get(LLM_PROVIDER)
+    if provider is None:
+        return
+    for attempt in range(1, LLM_WARM_UP_ATTEMPTS + 1):
+        try:
+            await asyncio.wait_for(provider.warm_up(), LLM_WARM_UP_TIMEOUT_SECONDS)
+            return
+        except Exception as e:
+            logging.warning(
+                "Failed to preload %s (attempt %d/%d): %s",
+                OLLAMA_MODEL,
+                attempt,
+                LLM_WARM_UP_ATTEMPTS,
+                str(e) or type(e).__name__,
+            )
+        if attempt < LLM_WARM_UP_ATTEMPTS:
+            await asyncio.sleep(min(2**attempt, 60))
+
+
+async def start_warm_up() -> None:
+    """
+    Start warming up the configured provider in the background.
+    """
+    global _WARM_UP_TASK  # pylint: disable=global-statement
+    _WARM_UP_TASK = asyncio.create_task(warm_up_provider())
+
+
+async def stop_warm_up() -> None:
+    """
+    Cancel the warm-up if it is still running.
+    """
+    if _WARM_UP_TASK is not None and not _WARM_UP_TASK.done():
+        _WARM_UP_TASK.cancel()
+        await asyncio.gather(_WARM_UP_TASK, return_exceptions=True)
+
+
 class LLMProviderFactory:
     """
     Factory class to return the appropriate LLM provider based on the provider name.
@@ -77,20 +492,74 @@ class LLMProviderFactory:
 
     @staticmethod
     def get_provider(provider_name: str) -> BaseLLMProvider:
-        if provider_name == "local":
-            return LocalLLMProvider()
-        if provider_name == "openai":
-            return OpenAILLMProvider()
-        if provider_name == "deepseek":
-            return DeepSeekLLMProvider()
-        raise HTTPException(status_code=400, detail="Unsupported LLM_PROVIDER value")
+        provider = PROVIDERS.get(provider_name)
+        if provider is None:
+            raise HTTPException(
+                status_code=400, detail="Unsupported LLM_PROVIDER value"
+            )
+        return provider
 
 
-@router.post("/analyze")
-def analyze_function(data: FunctionCode):
+@router.post("/analyze", openapi_extra=_body_schema(FunctionCode))
+async def analyze_function(
+    request: Request, data: FunctionCode = Depends(_request_body(FunctionCode))
+):
     """
     Analyze the function code using the selected LLM provider.
     """
-    provider_name = os.getenv("LLM_PROVIDER", "local").lower()
-    provider = LLMProviderFactory.get_provider(provider_name)
-    return provider.analyze(data.function_code)
+    provider = LLMProviderFactory.get_provider(LLM_PROVIDER)
+    return _respond(request, await provider.analyze(data.function_code))
+
+
+@router.post("/analyze/batch", openapi_extra=_body_schema(FunctionCodes))
+async def analyze_functions(
+    request: Request, data: FunctionCodes = Depends(_request_body(FunctionCodes))
+):
+    """
+    Analyze several function codes in one request using the selected LLM provider.
+    """
+    provider = LLMProviderFactory.get_provider(LLM_PROVIDER)
+    results = await provider.analyze_batch(data.function_codes)
+    return _respond(request, {"results": results})
+
+
+async def _ndjson_deltas(
+    first: List[str], chunks: AsyncIterator[str]
+) -> AsyncIterator[str]:
+    """
+    Encode the already received first chunks and the rest of the response as
+    newline-delimited JSON. Errors raised after the response has started are
+    reported as a final {"error": ...} line.
+    """
+    try:
+        for chunk in first:
+            yield json.dumps({"delta": chunk}) + "\n"
+        async for chunk in chunks:
+            yield json.dumps({"delta": chunk}) + "\n"
+    except HTTPException as he:
+        yield json.dumps({"error": he.detail}) + "\n"
+    except Exception as e:
+        yield json.dumps({"error": str(e)}) + "\n"
+
+
+@router.post("/analyze/stream", openapi_extra=_body_schema(FunctionCode))
+async def analyze_function_stream(
+    data: FunctionCode = Depends(_request_body(FunctionCode)),
+):
+    """
+    Analyze the function code using the selected LLM provider, streaming the
+    response as newline-delimited JSON as it is generated.
+
+    The first chunk is awaited before the response starts, so errors raised
+    before anything is generated keep their status code like /analyze.
+    """
+    provider = LLMProviderFactory.get_provider(LLM_PROVIDER)
+    chunks = provider.analyze_stream(data.function_code)
+    try:
+        # anext() is only a builtin from Python 3.10 on.
+        first = [await chunks.__anext__()]  # pylint: disable=unnecessary-dunder-call
+    except StopAsyncIteration:
+        first = []
+    return StreamingResponse(
+        _ndjson_deltas(first, chunks), media_type="application/x-ndjson"
+    )
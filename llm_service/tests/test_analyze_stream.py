@@ -0,0 +1,93 @@
+"""
+Tests for the status codes and NDJSON body of /analyze/stream.
+"""
+
+import json
+from typing import AsyncIterator
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.routes import analyze
+from app.routes.analyze import BaseLLMProvider
+
+app = FastAPI()
+app.include_router(analyze.router)
+client = TestClient(app)
+
+
+class FakeProvider(BaseLLMProvider):
+    def __init__(self, chunks, fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+
+    async def analyze(self, function_code: str) -> dict:
+        return {"suggestions": self.chunks}
+
+    async def analyze_stream(self, function_code: str) -> AsyncIterator[str]:
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise HTTPException(status_code=500, detail="Local LLM error: boom")
+            yield chunk
+        if self.fail_after == len(self.chunks):
+            raise HTTPException(status_code=500, detail="Local LLM error: boom")
+
+
+def _stream(monkeypatch, provider_name, provider=None):
+    if provider is not None:
+        monkeypatch.setitem(analyze.PROVIDERS, provider_name, provider)
+    monkeypatch.setattr(analyze, "LLM_PROVIDER", provider_name)
+    return client.post("/analyze/stream", json={"function_code": "def f(): pass"})
+
+
+def _lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_streams_deltas(monkeypatch):
+    response = _stream(monkeypatch, "fake", FakeProvider(["a", "b", "c"]))
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert _lines(response) == [{"delta": "a"}, {"delta": "b"}, {"delta": "c"}]
+
+
+def test_empty_stream(monkeypatch):
+    response = _stream(monkeypatch, "fake", FakeProvider([]))
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+def test_error_before_first_chunk_keeps_status(monkeypatch):
+    response = _stream(monkeypatch, "fake", FakeProvider(["a"], fail_after=0))
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Local LLM error: boom"}
+
+
+def test_stub_provider_is_501(monkeypatch):
+    response = _stream(monkeypatch, "openai")
+    assert response.status_code == 501
+
+
+@pytest.mark.parametrize("fail_after", [1, 2])
+def test_error_mid_stream_is_final_line(monkeypatch, fail_after):
+    response = _stream(monkeypatch, "fake", FakeProvider(["a", "b"], fail_after))
+    assert response.status_code == 200
+    lines = _lines(response)
+    assert lines[:-1] == [{"delta": c} for c in ["a", "b"][:fail_after]]
+    assert lines[-1] == {"error": "Local LLM error: boom"}
+
+
+def test_ollama_unreachable_is_500(monkeypatch):
+    async def no_cache(key):
+        return None
+
+    async def unreachable(prompt):
+        raise ConnectionError("connection refused")
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(analyze, "_cache_get", no_cache)
+    monkeypatch.setattr(analyze._BATCHER, "stream", unreachable)
+    response = _stream(monkeypatch, "local")
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("Local LLM error:")
@@ -0,0 +1,87 @@
+"""
+Tests for queueing, dispatching and stopping the MicroBatcher.
+"""
+
+import asyncio
+
+import pytest
+
+from app.routes.analyze import MicroBatcher
+
+
+class FakeClient:
+    def __init__(self, delay=0.0, fail=None):
+        self.delay = delay
+        self.fail = fail
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate(self, model, prompt, **kwargs):
+        self.prompts.append(prompt)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if prompt == self.fail:
+                raise ConnectionError("connection refused")
+            return {"response": prompt.upper()}
+        finally:
+            self.in_flight -= 1
+
+
+def _batcher(client, max_batch=8, window_ms=0, max_concurrency=2):
+    batcher = MicroBatcher(max_batch, window_ms, max_concurrency)
+    batcher._client = client
+    return batcher
+
+
+def test_concurrent_prompts_are_generated_within_the_limit():
+    client = FakeClient(delay=0.01)
+    batcher = _batcher(client, max_concurrency=2)
+
+    async def main():
+        results = await asyncio.gather(*(batcher.submit(p) for p in "abcde"))
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(main())
+    assert [r["response"] for r in results] == list("ABCDE")
+    assert sorted(client.prompts) == list("abcde")
+    assert client.max_in_flight == 2
+
+
+def test_errors_reach_only_their_submitter():
+    batcher = _batcher(FakeClient(fail="b"))
+
+    async def main():
+        results = await asyncio.gather(
+            *(batcher.submit(p) for p in "abc"), return_exceptions=True
+        )
+        await batcher.stop()
+        return results
+
+    a, b, c = asyncio.run(main())
+    assert a == {"response": "A"} and c == {"response": "C"}
+    assert isinstance(b, ConnectionError)
+
+
+def test_stop_cancels_pending_prompts_and_can_restart():
+    batcher = _batcher(FakeClient(delay=10))
+
+    async def main():
+        pending = asyncio.ensure_future(batcher.submit("a"))
+        await asyncio.sleep(0.01)
+        await batcher.stop()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        batcher._client = FakeClient()
+        return await batcher.submit("b")
+
+    assert asyncio.run(main()) == {"response": "B"}
+
+
+def test_uses_each_running_loop():
+    batcher = _batcher(FakeClient())
+    for prompt in "ab":
+        assert asyncio.run(batcher.submit(prompt)) == {"response": prompt.upper()}
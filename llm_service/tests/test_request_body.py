@@ -0,0 +1,75 @@
+"""
+Tests for parsing msgpack and JSON request bodies with _request_body.
+"""
+
+import ormsgpack
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes.analyze import MSGPACK_MEDIA_TYPE, FunctionCode, _request_body
+
+app = FastAPI()
+
+
+@app.post("/echo")
+async def echo(data: FunctionCode = Depends(_request_body(FunctionCode))) -> dict:
+    return {"function_code": data.function_code}
+
+
+client = TestClient(app)
+
+
+def _post(body: bytes, content_type: str):
+    return client.post("/echo", content=body, headers={"Content-Type": content_type})
+
+
+@pytest.mark.parametrize("content_type", ["application/json", MSGPACK_MEDIA_TYPE])
+def test_valid_body(content_type):
+    payload = {"function_code": "def f(): pass"}
+    body = (
+        ormsgpack.packb(payload)
+        if content_type == MSGPACK_MEDIA_TYPE
+        else b'{"function_code": "def f(): pass"}'
+    )
+    response = _post(body, content_type)
+    assert response.status_code == 200
+    assert response.json() == payload
+
+
+@pytest.mark.parametrize("body", [b"{not json", b"\xff\xfe", b""])
+def test_malformed_json_is_422_without_echoing_the_body(body):
+    response = _post(body, "application/json")
+    assert response.status_code == 422
+    [error] = response.json()["detail"]
+    assert error["type"] == "json_invalid"
+    assert error["loc"][0] == "body"
+    assert error["input"] == {}
+
+
+def test_missing_field_is_422_under_body():
+    response = _post(b'{"code": "x"}', "application/json")
+    assert response.status_code == 422
+    [error] = response.json()["detail"]
+    assert error["type"] == "missing"
+    assert error["loc"] == ["body", "function_code"]
+
+
+def test_msgpack_validation_error_is_422():
+    response = _post(ormsgpack.packb({"function_code": 1}), MSGPACK_MEDIA_TYPE)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["body", "function_code"]
+
+
+def test_msgpack_non_utf8_bytes_are_not_echoed():
+    response = _post(
+        ormsgpack.packb({"function_code": b"\xff\xfe"}), MSGPACK_MEDIA_TYPE
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["input"] == {}
+
+
+def test_malformed_msgpack_is_400():
+    response = _post(b"\xc1", MSGPACK_MEDIA_TYPE)
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid msgpack body")
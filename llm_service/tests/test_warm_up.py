@@ -0,0 +1,72 @@
+"""
+Tests for warming up the LLM provider in the background at startup.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import analyze
+from app.routes.analyze import BaseLLMProvider
+
+
+class FlakyProvider(BaseLLMProvider):
+    def __init__(self, failures=0, stall=False):
+        self.failures = failures
+        self.stall = stall
+        self.calls = 0
+
+    async def analyze(self, function_code: str) -> dict:
+        return {"suggestions": []}
+
+    async def warm_up(self) -> None:
+        self.calls += 1
+        if self.stall:
+            await asyncio.Event().wait()
+        if self.calls <= self.failures:
+            raise ConnectionError("connection refused")
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    def install(**kwargs):
+        provider = FlakyProvider(**kwargs)
+        monkeypatch.setitem(analyze.PROVIDERS, "flaky", provider)
+        monkeypatch.setattr(analyze, "LLM_PROVIDER", "flaky")
+        return provider
+
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr(asyncio, "sleep", lambda delay: real_sleep(0))
+    return install
+
+
+def test_retries_until_warm(provider, monkeypatch):
+    flaky = provider(failures=2)
+    monkeypatch.setattr(analyze, "LLM_WARM_UP_ATTEMPTS", 5)
+    asyncio.run(analyze.warm_up_provider())
+    assert flaky.calls == 3
+
+
+def test_gives_up_after_the_last_attempt(provider, monkeypatch):
+    flaky = provider(failures=10)
+    monkeypatch.setattr(analyze, "LLM_WARM_UP_ATTEMPTS", 3)
+    asyncio.run(analyze.warm_up_provider())
+    assert flaky.calls == 3
+
+
+def test_stalled_attempts_time_out(provider, monkeypatch):
+    flaky = provider(stall=True)
+    monkeypatch.setattr(analyze, "LLM_WARM_UP_ATTEMPTS", 2)
+    monkeypatch.setattr(analyze, "LLM_WARM_UP_TIMEOUT_SECONDS", 0.01)
+    asyncio.run(analyze.warm_up_provider())
+    assert flaky.calls == 2
+
+
+def test_startup_does_not_wait_for_warm_up(provider):
+    flaky = provider(stall=True)
+    with TestClient(app) as client:
+        assert client.get("/").status_code == 200
+    assert flaky.calls == 1
+    assert analyze._WARM_UP_TASK.cancelled()
@@ -19,6 +19,16 @@ def lint(session):
     session.run("poetry", "run", "pylint", f"{LLM_SERVICE_PATH}/app")
 
 
+@nox.session(python=PYTHON_VERSIONS)
+def tests(session):
+    """
+    Run the test suites (using pytest) for both microservices.
+    """
+    for path in (CODE_ANALYSIS_PATH, LLM_SERVICE_PATH):
+        with session.chdir(path):
+            session.run("poetry", "run", "pytest")
+
+
 @nox.session(python=PYTHON_VERSIONS)
 def format(session):
     """